@@ -6,28 +6,32 @@ import logging
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.typing import ConfigType
+from homeassistant.helpers.storage import Store
 
-from .const import DOMAIN
+from .const import DOMAIN, STORAGE_KEY, STORAGE_VERSION
+from .coordinator import ElectroholdCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[Platform] = [Platform.SENSOR]
 
 
-async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
-    """Set up the Electrohold Tariffs component from YAML (for backward compatibility)."""
-    _LOGGER.info("Setting up Electrohold Tariffs integration")
-    return True
-
-
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Electrohold Tariffs from a config entry."""
     _LOGGER.info("Setting up Electrohold Tariffs from config entry")
     
-    # Store an empty dict for this entry
+    # Fetch the tariffs once and share them between all sensors
+    coordinator = ElectroholdCoordinator(hass, entry)
+    if await coordinator.async_load_cache():
+        # Serve the last known tariffs right away and refresh in the background
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN}_initial_refresh"
+        )
+    else:
+        await coordinator.async_config_entry_first_refresh()
+
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = {}
+    hass.data[DOMAIN][entry.entry_id] = coordinator
     
     # Forward the setup to the sensor platform
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
@@ -53,4 +57,9 @@ async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload the Electrohold Tariffs integration."""
     _LOGGER.info("Reloading Electrohold Tariffs integration")
     await async_unload_entry(hass, entry)
-    await async_setup_entry(hass, entry)
\ No newline at end of file
+    await async_setup_entry(hass, entry)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the cached tariffs when the config entry is deleted."""
+    await Store(hass, STORAGE_VERSION, STORAGE_KEY).async_remove()
@@ -1,15 +1,26 @@
 """Constants for the Electrohold Tariffs integration."""
+from datetime import timedelta
 from typing import Final
 
 DOMAIN: Final = "electrohold_tariffs"
 
-# Configuration constants
-CONF_TIMEZONE: Final = "timezone"
-DEFAULT_TIMEZONE: Final = "Europe/Sofia"
-
 # Electrohold website URL
 ELECTROHOLD_URL: Final = "https://electrohold.bg/bg/sales/domakinstva/snabdyavane-po-regulirani-ceni/"
 
+# Refresh the tariffs once a day
+UPDATE_INTERVAL: Final = timedelta(days=1)
+UPDATE_INTERVAL_JITTER: Final = timedelta(minutes=30)
+
+# Reuse parsed tariffs across coordinator instances for this long
+CACHE_TTL: Final = timedelta(hours=6)
+
+# Persistent cache of the last parsed tariffs
+STORAGE_KEY: Final = f"{DOMAIN}_cache"
+STORAGE_VERSION: Final = 1
+
+# User agent sent with every request to the Electrohold website
+USER_AGENT: Final = "HomeAssistant-ElectroholdTariffs/2.0"
+
 # VAT rate (20%)
 VAT_RATE: Final = 1.2
 
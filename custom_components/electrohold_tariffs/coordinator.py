@@ -0,0 +1,415 @@
+"""Data update coordinator for the Electrohold Tariffs integration."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+from functools import lru_cache
+import hashlib
+from http import HTTPStatus
+import logging
+import random
+import re
+import time
+from typing import Any, Final
+
+import aiohttp
+from aiohttp import hdrs
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import (
+    TimestampDataUpdateCoordinator,
+    UpdateFailed,
+)
+from homeassistant.util import dt as dt_util
+from lxml import etree, html as lxml_html
+
+from .const import (
+    CACHE_TTL,
+    DOMAIN,
+    ELECTROHOLD_URL,
+    STORAGE_KEY,
+    STORAGE_VERSION,
+    UPDATE_INTERVAL,
+    UPDATE_INTERVAL_JITTER,
+    USER_AGENT,
+)
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+# Ask for a compressed page, aiohttp decompresses it transparently
+REQUEST_HEADERS: Final = {
+    hdrs.USER_AGENT: USER_AGENT,
+    hdrs.ACCEPT_ENCODING: "gzip, deflate",
+    hdrs.ACCEPT_LANGUAGE: "bg,en;q=0.5",
+}
+
+# Euro price such as "0,12478 €/кВтч" or "0.12478 €"
+_EURO_RE: Final = re.compile(r"(\d+[,\.]\d+)\s*€")
+# Decimal comma to decimal point
+_COMMA_TO_DOT: Final = str.maketrans(",", ".")
+
+# Row labels of the day and night tariffs
+_DAY_MARK: Final = "Дневна"
+_NIGHT_MARK: Final = "Нощна"
+# Row label, component key and plausible base price range (min, max) in €/kWh
+_TARIFF_ROWS: Final = (
+    (_DAY_MARK, "day_base", 0.1, None),
+    (_NIGHT_MARK, "night_base", 0.05, 0.1),
+)
+# The page is served as UTF-8, lxml would assume Latin-1 without a <meta> charset
+_HTML_PARSER: Final = lxml_html.HTMLParser(encoding="utf-8")
+# Rows with a cell carrying either label, compiled once for every parse
+_ROW_XPATH: Final = etree.XPath(
+    f'//tr[(td|th)[contains(., "{_DAY_MARK}") or contains(., "{_NIGHT_MARK}")]]'
+)
+# Row children holding the cell texts
+_CELL_TAGS: Final = ("td", "th")
+# The same labels in the UTF-8 encoded page, probed before parsing
+_DAY_MARK_BYTES: Final = _DAY_MARK.encode()
+_NIGHT_MARK_BYTES: Final = _NIGHT_MARK.encode()
+
+# Fast path: the first Euro price following each label in the raw page
+_TARIFF_RE: Final = re.compile(
+    rf"({_DAY_MARK}|{_NIGHT_MARK})[^€]{{0,400}}?(\d+[,\.]\d+)\s*€", re.DOTALL
+)
+# Upper bound for ranges the table walker leaves open, in €/kWh
+_FAST_PATH_MAX_PRICE: Final = 0.30
+# The fast path only trusts values the table walker would also accept
+_FAST_PATH_RANGES: Final = {
+    key: (
+        min_value,
+        _FAST_PATH_MAX_PRICE if max_value is None else max_value,
+    )
+    for _, key, min_value, max_value in _TARIFF_ROWS
+}
+
+# Retry network errors, transient server errors and rate limiting before
+# giving up on the cycle
+FETCH_ATTEMPTS: Final = 3
+RETRY_STATUSES: Final = frozenset(
+    {
+        HTTPStatus.TOO_MANY_REQUESTS,
+        HTTPStatus.INTERNAL_SERVER_ERROR,
+        HTTPStatus.BAD_GATEWAY,
+        HTTPStatus.SERVICE_UNAVAILABLE,
+        HTTPStatus.GATEWAY_TIMEOUT,
+    }
+)
+MAX_RETRY_DELAY: Final = 60.0
+
+
+def _retry_delay(retry_after: str | None, attempt: int) -> float:
+    """Return the delay before the next attempt, honouring Retry-After."""
+    if retry_after is not None and retry_after.isdigit():
+        return min(float(retry_after), MAX_RETRY_DELAY)
+    return min(2**attempt + random.random(), MAX_RETRY_DELAY)
+
+
+@lru_cache(maxsize=64)
+def _euro_price(text: str) -> float | None:
+    """Return the Euro price in a cell text, or None if it has none."""
+    match = _EURO_RE.search(text)
+    if match is None:
+        return None
+    return float(match.group(1).translate(_COMMA_TO_DOT))
+
+
+class _TTLCache:
+    """Hold a single value for a limited time."""
+
+    def __init__(self, ttl: timedelta) -> None:
+        """Initialize the cache."""
+        self._ttl = ttl.total_seconds()
+        self._value: dict[str, float] | None = None
+        self._timestamp = 0.0
+
+    def get(self) -> dict[str, float] | None:
+        """Return the cached value if it has not expired."""
+        if time.monotonic() - self._timestamp < self._ttl:
+            return self._value
+        return None
+
+    def set(self, value: dict[str, float]) -> None:
+        """Store a value and restart the expiry clock."""
+        self._value = value
+        self._timestamp = time.monotonic()
+
+
+# Parsed tariffs shared across coordinator instances, e.g. over an entry reload
+_CACHE: Final = _TTLCache(CACHE_TTL)
+
+
+class ElectroholdCoordinator(TimestampDataUpdateCoordinator[dict[str, float]]):
+    """Fetch and parse the Electrohold tariff page once for all sensors."""
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            config_entry=entry,
+            name=DOMAIN,
+            # Spread the daily refresh so installations do not hit the site at once
+            update_interval=UPDATE_INTERVAL
+            + timedelta(
+                seconds=random.uniform(
+                    -UPDATE_INTERVAL_JITTER.total_seconds(),
+                    UPDATE_INTERVAL_JITTER.total_seconds(),
+                )
+            ),
+        )
+        # Home Assistant's shared session keeps the connection pool warm
+        self._session = async_get_clientsession(hass)
+        # Validators of the last successfully parsed page
+        self._etag: str | None = None
+        self._last_modified: str | None = None
+        self._content_hash: str | None = None
+        # Last parsed tariffs, kept on disk so restarts do not wait for the site
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+
+    async def async_load_cache(self) -> bool:
+        """Seed the coordinator with the tariffs stored by the last run."""
+        cached = await self._store.async_load()
+        if not cached:
+            return False
+
+        self.data = {
+            "day_base": cached["day_base"],
+            "night_base": cached["night_base"],
+        }
+        self._etag = cached.get("etag")
+        self._last_modified = cached.get("last_modified")
+        self._content_hash = cached.get("content_hash")
+        self.last_update_success_time = dt_util.utc_from_timestamp(cached["ts"])
+        _LOGGER.debug("Loaded cached tariff components: %s", self.data)
+        return True
+
+    async def _async_save_cache(self, tariff_data: dict[str, float]) -> None:
+        """Store the tariffs with the time they were last confirmed."""
+        await self._store.async_save(
+            {
+                **tariff_data,
+                "etag": self._etag,
+                "last_modified": self._last_modified,
+                "content_hash": self._content_hash,
+                "ts": time.time(),
+            }
+        )
+
+    async def _async_update_data(self) -> dict[str, float]:
+        """Fetch the tariff page and parse the day and night base prices."""
+        if (cached := _CACHE.get()) is not None:
+            _LOGGER.debug("Using tariff components parsed less than %s ago", CACHE_TTL)
+            return cached
+
+        # Only ask for a conditional response if there is data to fall back to
+        headers = {**REQUEST_HEADERS}
+        if self.data:
+            if self._etag:
+                headers[hdrs.IF_NONE_MATCH] = self._etag
+            if self._last_modified:
+                headers[hdrs.IF_MODIFIED_SINCE] = self._last_modified
+
+        for attempt in range(FETCH_ATTEMPTS):
+            try:
+                _LOGGER.debug("Fetching data from: %s", ELECTROHOLD_URL)
+                async with asyncio.timeout(10):
+                    async with self._session.get(ELECTROHOLD_URL, headers=headers) as response:
+                        if response.status == HTTPStatus.NOT_MODIFIED and self.data:
+                            content = None
+                            break
+                        if (
+                            response.status in RETRY_STATUSES
+                            and attempt < FETCH_ATTEMPTS - 1
+                        ):
+                            delay = _retry_delay(
+                                response.headers.get(hdrs.RETRY_AFTER), attempt
+                            )
+                            _LOGGER.warning(
+                                "Electrohold website returned status %d, retrying in %.1f s",
+                                response.status,
+                                delay,
+                            )
+                        else:
+                            response.raise_for_status()
+                            content = await response.read()
+                            etag = response.headers.get(hdrs.ETAG)
+                            last_modified = response.headers.get(hdrs.LAST_MODIFIED)
+                            break
+            except aiohttp.ClientResponseError as exc:
+                raise UpdateFailed(
+                    f"Error fetching electricity tariff data: {exc}"
+                ) from exc
+            except (aiohttp.ClientError, TimeoutError) as exc:
+                # Connection errors and timeouts are usually transient,
+                # asyncio.timeout raises a TimeoutError without a message
+                error = "request timed out" if isinstance(exc, TimeoutError) else exc
+                if attempt == FETCH_ATTEMPTS - 1:
+                    raise UpdateFailed(
+                        f"Error fetching electricity tariff data: {error}"
+                    ) from exc
+                delay = _retry_delay(None, attempt)
+                _LOGGER.warning(
+                    "Error fetching electricity tariff data: %s, retrying in %.1f s",
+                    error,
+                    delay,
+                )
+
+            await asyncio.sleep(delay)
+
+        if content is None:
+            _LOGGER.debug("Tariff page not modified, keeping previous data")
+            await self._async_save_cache(self.data)
+            return self.data
+
+        _LOGGER.debug(
+            "Successfully fetched webpage, status code: %d",
+            response.status,
+        )
+
+        # Skip parsing if the server ignored the validators but the page is unchanged
+        content_hash = hashlib.sha1(content, usedforsecurity=False).hexdigest()
+        if content_hash == self._content_hash and self.data:
+            _LOGGER.debug("Tariff page content unchanged, keeping previous data")
+            self._etag = etag
+            self._last_modified = last_modified
+            await self._async_save_cache(self.data)
+            return self.data
+
+        # A page without the tariff labels (maintenance, redesign) is not worth parsing
+        if _DAY_MARK_BYTES not in content or _NIGHT_MARK_BYTES not in content:
+            raise UpdateFailed("Tariff markers not present on the Electrohold page")
+
+        # Parse the page in the executor so the event loop stays free
+        tariff_data = await self.hass.async_add_executor_job(
+            self._parse_tariff_components, content
+        )
+        _LOGGER.debug("Parsed tariff components: %s", tariff_data)
+
+        if not tariff_data:
+            raise UpdateFailed("Failed to parse tariff components - no data found")
+
+        self._etag = etag
+        self._last_modified = last_modified
+        self._content_hash = content_hash
+
+        _CACHE.set(tariff_data)
+        await self._async_save_cache(tariff_data)
+
+        return tariff_data
+
+    def _parse_tariff_components(self, content: bytes) -> dict[str, float]:
+        """Parse the tariff components from the raw webpage in the executor."""
+        components: dict[str, float] = {}
+
+        try:
+            _LOGGER.debug("Starting to parse tariff components from webpage...")
+
+            # Try a single regex scan of the page before building any tree
+            matched = self._match_tariff_components(
+                content.decode("utf-8", errors="replace")
+            )
+            if matched:
+                _LOGGER.debug("Tariff components matched without parsing: %s", matched)
+                return matched
+
+            tree = lxml_html.fromstring(content, parser=_HTML_PARSER)
+
+            # Let lxml select only the rows labelled as day or night tariff
+            rows = _ROW_XPATH(tree)
+            _LOGGER.debug("Found %d tariff rows on the page", len(rows))
+            
+            # Parse main tariff table (day/night prices)
+            for row in rows:
+                cell_texts = [
+                    cell.text_content().strip()
+                    for cell in row.iterchildren(*_CELL_TAGS)
+                ]
+                row_text = "\t".join(cell_texts)
+                
+                # Look for the day ("Дневна") or night ("Нощна") tariff row
+                for mark, key, min_value, max_value in _TARIFF_ROWS:
+                    if mark not in row_text:
+                        continue
+                    _LOGGER.debug("Found %s tariff row: %s", key, cell_texts)
+                    value = self._extract_euro_value(cell_texts, min_value, max_value)
+                    if value:
+                        components[key] = value
+                        _LOGGER.debug(
+                            "✓ Found %s (with all fees, before VAT): %s €/kWh",
+                            key,
+                            value,
+                        )
+                    break
+
+                # Both tariffs found, the remaining rows are irrelevant
+                if len(components) == len(_TARIFF_ROWS):
+                    break
+        
+            # Verify required components were found
+            expected_keys = [key for _, key, _, _ in _TARIFF_ROWS]
+            missing_keys = [
+                key for key in expected_keys
+                if key not in components or components[key] == 0
+            ]
+            
+            if missing_keys:
+                _LOGGER.warning("Could not find some components: %s", missing_keys)
+                # Set missing components to 0
+                for key in missing_keys:
+                    if key not in components:
+                        components[key] = 0
+            
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                found_count = len([v for v in components.values() if v > 0])
+                _LOGGER.debug(
+                    "Tariff parsing complete. Components found: %d/%d",
+                    found_count,
+                    len(expected_keys),
+                )
+                _LOGGER.debug("All parsed components: %s", components)
+            return components
+
+        except Exception as exc:  # pylint: disable=broad-except
+            _LOGGER.error(
+                "Error parsing tariff components: %s",
+                exc,
+                exc_info=True,
+            )
+            return {}
+
+    def _match_tariff_components(self, text: str) -> dict[str, float] | None:
+        """Match both tariffs in the raw page, or return None if ambiguous."""
+        hits: dict[str, list[float]] = {key: [] for key in _FAST_PATH_RANGES}
+        for match in _TARIFF_RE.finditer(text):
+            key = "day_base" if match.group(1) == _DAY_MARK else "night_base"
+            hits[key].append(float(match.group(2).translate(_COMMA_TO_DOT)))
+
+        components: dict[str, float] = {}
+        for key, values in hits.items():
+            min_value, max_value = _FAST_PATH_RANGES[key]
+            if len(values) != 1 or not min_value <= values[0] <= max_value:
+                return None
+            components[key] = values[0]
+        return components
+
+    def _extract_euro_value(
+        self,
+        cell_texts: list[str],
+        min_value: float = 0.0,
+        max_value: float | None = None,
+    ) -> float | None:
+        """Extract Euro value from cell texts with optional range validation."""
+        for text in cell_texts:
+            value = _euro_price(text)
+            if value is not None:
+                # Apply range validation
+                if value < min_value:
+                    continue
+                if max_value is not None and value > max_value:
+                    continue
+                    
+                return value
+        return None